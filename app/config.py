@@ -11,3 +11,6 @@ class Settings:
     OPENWEATHERMAP_APIKEY: str = os.getenv("OPENWEATHERMAP_APIKEY")
     SERPAPI_APIKEY: str = os.getenv("SERPAPI_APIKEY")
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL")
+    VECTOR_STORE_PATH: str = os.getenv("VECTOR_STORE_PATH") or "vector_store"
+    REDIS_URL: str = os.getenv("REDIS_URL") or "redis://localhost:6379/0"
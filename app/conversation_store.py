@@ -0,0 +1,72 @@
+import json
+from datetime import datetime
+
+from config import Settings
+from redis.asyncio import Redis
+
+CONVERSATIONS_KEY = "conversations"
+
+_redis = None
+
+
+def get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(Settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def close_redis():
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def _conv_key(conversation_id: str) -> str:
+    return f"conv:{conversation_id}"
+
+
+def _messages_key(conversation_id: str) -> str:
+    return f"conv:{conversation_id}:msgs"
+
+
+async def create_conversation(conversation_id: str):
+    redis = get_redis()
+    now = datetime.now()
+    if await redis.hsetnx(_conv_key(conversation_id), "created_at", now.isoformat()):
+        await redis.zadd(CONVERSATIONS_KEY, {conversation_id: now.timestamp()})
+
+
+async def get_conversation(conversation_id: str) -> dict | None:
+    async with get_redis().pipeline(transaction=False) as pipe:
+        pipe.hget(_conv_key(conversation_id), "created_at")
+        pipe.lrange(_messages_key(conversation_id), 0, -1)
+        created_at, messages = await pipe.execute()
+
+    if created_at is None:
+        return None
+    return {
+        "messages": [json.loads(m) for m in messages],
+        "created_at": created_at,
+    }
+
+
+async def get_messages(conversation_id: str) -> list[dict]:
+    messages = await get_redis().lrange(_messages_key(conversation_id), 0, -1)
+    return [json.loads(m) for m in messages]
+
+
+async def get_message_counts(conversation_ids: list[str]) -> list[int]:
+    async with get_redis().pipeline(transaction=False) as pipe:
+        for conversation_id in conversation_ids:
+            pipe.llen(_messages_key(conversation_id))
+        return await pipe.execute()
+
+
+async def append_message(conversation_id: str, message: dict):
+    await get_redis().rpush(_messages_key(conversation_id), json.dumps(message))
+
+
+async def list_conversations() -> list[str]:
+    return await get_redis().zrevrange(CONVERSATIONS_KEY, 0, -1)
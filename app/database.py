@@ -1,7 +1,8 @@
 from contextlib import contextmanager
 
 from config import Settings
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -11,10 +12,32 @@ _engine = None
 _SessionLocal = None
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
 def get_engine():
     global _engine
     if _engine is None:
-        _engine = create_engine(Settings.DATABASE_URL)
+        url = make_url(Settings.DATABASE_URL)
+        if url.get_backend_name() == "sqlite":
+            _engine = create_engine(
+                url,
+                pool_pre_ping=True,
+                connect_args={"check_same_thread": False},
+            )
+            event.listen(_engine, "connect", _set_sqlite_pragmas)
+        else:
+            _engine = create_engine(
+                url,
+                pool_size=20,
+                max_overflow=40,
+                pool_pre_ping=True,
+                pool_recycle=1800,
+            )
     return _engine
 
 
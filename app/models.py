@@ -1,11 +1,24 @@
 from datetime import datetime, timezone
 
 from database import Base
-from sqlalchemy import Column, Date, DateTime, Integer, String, Text, Time
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    Text,
+    Time,
+    func,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import to_tsvector
 
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (Index("ix_event_date_start", "event_date", "event_start_time"),)
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String(255), nullable=False)
@@ -22,3 +35,19 @@ class Event(Base):
         onupdate=lambda: datetime.now(timezone.utc),
         nullable=True,
     )
+
+
+# Literal SQL (no bound params) so queries match the indexed expression exactly
+event_search_vector = to_tsvector(
+    literal_column("'english'"),
+    Event.title
+    + literal_column("' '", String)
+    + func.coalesce(Event.description, literal_column("''", String)),
+)
+
+# The leading literal keeps Index from inferring its table, so attach it explicitly
+Event.__table__.append_constraint(
+    Index("ix_event_fts", event_search_vector, postgresql_using="gin").ddl_if(
+        dialect="postgresql"
+    )
+)
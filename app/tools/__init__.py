@@ -1,7 +1,9 @@
 from .datetime_tool import get_current_datetime
+from .documents import retrieve_document_context
 from .events import (
     check_event_exists,
     create_event,
+    create_events,
     delete_event,
     get_event_by_id,
     query_events,
@@ -9,12 +11,29 @@ from .events import (
 from .search_google import google_search
 from .weather import get_current_weather, get_weather_forecast
 
+TOOLS = [
+    get_current_weather,
+    get_weather_forecast,
+    google_search,
+    get_current_datetime,
+    retrieve_document_context,
+    create_event,
+    create_events,
+    check_event_exists,
+    get_event_by_id,
+    query_events,
+    delete_event,
+]
+
 __all__ = [
+    "TOOLS",
     "google_search",
     "get_current_weather",
     "get_weather_forecast",
     "get_current_datetime",
+    "retrieve_document_context",
     "create_event",
+    "create_events",
     "check_event_exists",
     "get_event_by_id",
     "query_events",
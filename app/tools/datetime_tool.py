@@ -1,7 +1,18 @@
+import time
+from contextvars import ContextVar
 from datetime import datetime, timezone
 
 from langchain_core.tools import tool
 
+_CACHE_TTL = 1.0
+
+# Holds a per-request dict so tool calls running in copied contexts share it
+_cache: ContextVar[dict | None] = ContextVar("current_datetime_cache", default=None)
+
+
+def reset_datetime_cache():
+    _cache.set({})
+
 
 @tool
 def get_current_datetime() -> dict:
@@ -10,12 +21,24 @@ def get_current_datetime() -> dict:
     Returns:
         Dictionary with current date, time, and datetime in ISO format
     """
+    cache = _cache.get()
+    if cache and time.monotonic() - cache["ts"] < _CACHE_TTL:
+        return cache["result"]
+
     now = datetime.now(timezone.utc)
-    return {
-        "current_date": now.date().isoformat(),
-        "current_time": now.time().strftime("%H:%M:%S"),
-        "current_datetime": now.isoformat(),
-        "date_formatted": now.strftime("%Y-%m-%d"),
-        "time_formatted": now.strftime("%H:%M:%S"),
-        "datetime_formatted": now.strftime("%Y-%m-%d %H:%M:%S"),
+    iso = now.isoformat()
+    current_date = iso[:10]
+    current_time = iso[11:19]
+    result = {
+        "current_date": current_date,
+        "current_time": current_time,
+        "current_datetime": iso,
+        "date_formatted": current_date,
+        "time_formatted": current_time,
+        "datetime_formatted": f"{current_date} {current_time}",
     }
+
+    if cache is not None:
+        cache["ts"] = time.monotonic()
+        cache["result"] = result
+    return result
@@ -0,0 +1,19 @@
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import tool
+from vector_store import search_documents
+
+
+@tool
+async def retrieve_document_context(query: str, config: RunnableConfig) -> dict:
+    """
+    Search the documents the user uploaded in this conversation.
+    Args:
+        query: What to look for in the uploaded documents
+    Returns:
+        Dictionary with the most relevant passages and their source file
+    """
+    conversation_id = config["configurable"]["conversation_id"]
+    results = await search_documents(conversation_id, query)
+    if not results:
+        return {"results": [], "message": "No uploaded documents in this conversation"}
+    return {"results": results}
@@ -1,37 +1,37 @@
+import asyncio
 from datetime import date, time
 
 from database import get_session
 from langchain_core.tools import tool
-from models import Event
+from models import Event, event_search_vector
+from pydantic import BaseModel
+from sqlalchemy import insert, literal_column, select
+from sqlalchemy.dialects.postgresql import plainto_tsquery
 
 
-@tool
-def create_event(
-    title: str, event_date: str, start_time: str, end_time: str, description: str = ""
+class EventInput(BaseModel):
+    title: str
+    event_date: date
+    start_time: time
+    end_time: time
+    description: str = ""
+
+
+def _create_event(
+    title: str,
+    event_date: date,
+    start_time: time,
+    end_time: time,
+    description: str = "",
 ) -> dict:
-    """
-    Create a new event in the database.
-    Args:
-        title: Event title
-        event_date: Date in YYYY-MM-DD format (e.g., "2024-01-15")
-        start_time: Start time in HH:MM format in 24-hour format (e.g., "14:30")
-        end_time: End time in HH:MM format in 24-hour format (e.g., "16:00")
-        description: Optional event description
-    Returns:
-        Dictionary with event details or error message
-    """
     try:
-        event_date_obj = date.fromisoformat(event_date)
-        start_time_obj = time.fromisoformat(start_time)
-        end_time_obj = time.fromisoformat(end_time)
-
         with get_session() as session:
             event = Event(
                 title=title,
                 description=description,
-                event_date=event_date_obj,
-                event_start_time=start_time_obj,
-                event_end_time=end_time_obj,
+                event_date=event_date,
+                event_start_time=start_time,
+                event_end_time=end_time,
             )
             session.add(event)
             session.commit()
@@ -46,26 +46,113 @@ def create_event(
                 "start_time": str(event.event_start_time),
                 "end_time": str(event.event_end_time),
             }
-    except ValueError as e:
-        return {"status": "error", "message": f"Invalid date/time format: {str(e)}"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 @tool
-def check_event_exists(event_date: str) -> dict:
+async def create_event(
+    title: str,
+    event_date: date,
+    start_time: time,
+    end_time: time,
+    description: str = "",
+) -> dict:
     """
-    Check if any events exist on a given date.
+    Create a new event in the database.
     Args:
+        title: Event title
         event_date: Date in YYYY-MM-DD format (e.g., "2024-01-15")
+        start_time: Start time in HH:MM format in 24-hour format (e.g., "14:30")
+        end_time: End time in HH:MM format in 24-hour format (e.g., "16:00")
+        description: Optional event description
     Returns:
-        Dictionary with existence status and event details if found
+        Dictionary with event details or error message
     """
+    return await asyncio.to_thread(
+        _create_event, title, event_date, start_time, end_time, description
+    )
+
+
+def _create_events(events: list[EventInput]) -> dict:
+    rows = [
+        {
+            "title": e.title,
+            "description": e.description,
+            "event_date": e.event_date,
+            "event_start_time": e.start_time,
+            "event_end_time": e.end_time,
+        }
+        for e in events
+    ]
+
+    if not rows:
+        return {"status": "error", "message": "No events provided"}
+
+    try:
+        with get_session() as session:
+            created = session.execute(
+                insert(Event).returning(
+                    Event.id,
+                    Event.title,
+                    Event.event_date,
+                    Event.event_start_time,
+                    Event.event_end_time,
+                    sort_by_parameter_order=True,
+                ),
+                rows,
+            ).all()
+
+        return {
+            "status": "success",
+            "count": len(created),
+            "events": [
+                {
+                    "event_id": event.id,
+                    "title": event.title,
+                    "date": str(event.event_date),
+                    "start_time": str(event.event_start_time),
+                    "end_time": str(event.event_end_time),
+                }
+                for event in created
+            ],
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@tool
+async def create_events(events: list[EventInput]) -> dict:
+    """
+    Create several events at once (e.g. a recurring series) in a single transaction.
+    Args:
+        events: List of events, each a dictionary with keys:
+            title: Event title
+            event_date: Date in YYYY-MM-DD format (e.g., "2024-01-15")
+            start_time: Start time in HH:MM format in 24-hour format (e.g., "14:30")
+            end_time: End time in HH:MM format in 24-hour format (e.g., "16:00")
+            description: Optional event description
+    Returns:
+        Dictionary with the created events or error message
+    """
+    return await asyncio.to_thread(_create_events, events)
+
+
+def _check_event_exists(event_date: date) -> dict:
     try:
-        event_date_obj = date.fromisoformat(event_date)
         with get_session() as session:
             events = (
-                session.query(Event).filter(Event.event_date == event_date_obj).all()
+                session.execute(
+                    select(
+                        Event.id,
+                        Event.title,
+                        Event.event_start_time,
+                        Event.event_end_time,
+                        Event.description,
+                    ).where(Event.event_date == event_date)
+                )
+                .mappings()
+                .all()
             )
 
             if events:
@@ -74,46 +161,62 @@ def check_event_exists(event_date: str) -> dict:
                     "count": len(events),
                     "events": [
                         {
-                            "id": e.id,
-                            "title": e.title,
-                            "start_time": str(e.event_start_time),
-                            "end_time": str(e.event_end_time),
-                            "description": e.description,
+                            "id": e["id"],
+                            "title": e["title"],
+                            "start_time": str(e["event_start_time"]),
+                            "end_time": str(e["event_end_time"]),
+                            "description": e["description"],
                         }
                         for e in events
                     ],
                 }
             return {"exists": False, "count": 0}
-    except ValueError as e:
-        return {"status": "error", "message": f"Invalid date format: {str(e)}"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 @tool
-def get_event_by_id(event_id: int) -> dict:
+async def check_event_exists(event_date: date) -> dict:
     """
-    Get a specific event by its ID.
+    Check if any events exist on a given date.
     Args:
-        event_id: The ID of the event
+        event_date: Date in YYYY-MM-DD format (e.g., "2024-01-15")
     Returns:
-        Dictionary with event details or error message
+        Dictionary with existence status and event details if found
     """
+    return await asyncio.to_thread(_check_event_exists, event_date)
+
+
+def _get_event_by_id(event_id: int) -> dict:
     try:
         with get_session() as session:
-            event = session.query(Event).filter(Event.id == event_id).first()
+            event = (
+                session.execute(
+                    select(
+                        Event.id,
+                        Event.title,
+                        Event.description,
+                        Event.event_date,
+                        Event.event_start_time,
+                        Event.event_end_time,
+                        Event.created_at,
+                    ).where(Event.id == event_id)
+                )
+                .mappings()
+                .first()
+            )
 
             if event:
                 return {
                     "status": "success",
                     "event": {
-                        "id": event.id,
-                        "title": event.title,
-                        "description": event.description,
-                        "date": str(event.event_date),
-                        "start_time": str(event.event_start_time),
-                        "end_time": str(event.event_end_time),
-                        "created_at": str(event.created_at),
+                        "id": event["id"],
+                        "title": event["title"],
+                        "description": event["description"],
+                        "date": str(event["event_date"]),
+                        "start_time": str(event["event_start_time"]),
+                        "end_time": str(event["event_end_time"]),
+                        "created_at": str(event["created_at"]),
                     },
                 }
             return {
@@ -125,68 +228,98 @@ def get_event_by_id(event_id: int) -> dict:
 
 
 @tool
-def query_events(
-    start_date: str = None, end_date: str = None, keyword: str = None
-) -> dict:
+async def get_event_by_id(event_id: int) -> dict:
     """
-    Query events from the database. Can filter by date range or keyword.
+    Get a specific event by its ID.
     Args:
-        start_date: Optional start date in YYYY-MM-DD format for date range filtering
-        end_date: Optional end date in YYYY-MM-DD format for date range filtering
-        keyword: Optional keyword to search in event titles/descriptions
+        event_id: The ID of the event
     Returns:
-        Dictionary with list of events
+        Dictionary with event details or error message
     """
+    return await asyncio.to_thread(_get_event_by_id, event_id)
+
+
+def _query_events(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    keyword: str | None = None,
+) -> dict:
     try:
         with get_session() as session:
-            query = session.query(Event)
+            query = select(
+                Event.id,
+                Event.title,
+                Event.description,
+                Event.event_date,
+                Event.event_start_time,
+                Event.event_end_time,
+            )
 
             if start_date:
-                start_date_obj = date.fromisoformat(start_date)
-                query = query.filter(Event.event_date >= start_date_obj)
+                query = query.where(Event.event_date >= start_date)
 
             if end_date:
-                end_date_obj = date.fromisoformat(end_date)
-                query = query.filter(Event.event_date <= end_date_obj)
+                query = query.where(Event.event_date <= end_date)
 
             if keyword:
-                query = query.filter(
-                    (Event.title.contains(keyword))
-                    | (Event.description.contains(keyword))
-                )
+                if session.get_bind().dialect.name == "postgresql":
+                    query = query.where(
+                        event_search_vector.op("@@")(
+                            plainto_tsquery(literal_column("'english'"), keyword)
+                        )
+                    )
+                else:
+                    query = query.where(
+                        (Event.title.contains(keyword))
+                        | (Event.description.contains(keyword))
+                    )
 
-            events = query.order_by(Event.event_date, Event.event_start_time).all()
+            events = (
+                session.execute(
+                    query.order_by(Event.event_date, Event.event_start_time)
+                )
+                .mappings()
+                .all()
+            )
 
             return {
                 "status": "success",
                 "count": len(events),
                 "events": [
                     {
-                        "id": e.id,
-                        "title": e.title,
-                        "description": e.description,
-                        "date": str(e.event_date),
-                        "start_time": str(e.event_start_time),
-                        "end_time": str(e.event_end_time),
+                        "id": e["id"],
+                        "title": e["title"],
+                        "description": e["description"],
+                        "date": str(e["event_date"]),
+                        "start_time": str(e["event_start_time"]),
+                        "end_time": str(e["event_end_time"]),
                     }
                     for e in events
                 ],
             }
-    except ValueError as e:
-        return {"status": "error", "message": f"Invalid date format: {str(e)}"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 @tool
-def delete_event(event_id: int) -> dict:
+async def query_events(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    keyword: str | None = None,
+) -> dict:
     """
-    Delete an event from the database.
+    Query events from the database. Can filter by date range or keyword.
     Args:
-        event_id: The ID of the event to delete
+        start_date: Optional start date in YYYY-MM-DD format for date range filtering
+        end_date: Optional end date in YYYY-MM-DD format for date range filtering
+        keyword: Optional keyword to search in event titles/descriptions
     Returns:
-        Dictionary with deletion status
+        Dictionary with list of events
     """
+    return await asyncio.to_thread(_query_events, start_date, end_date, keyword)
+
+
+def _delete_event(event_id: int) -> dict:
     try:
         with get_session() as session:
             event = session.query(Event).filter(Event.id == event_id).first()
@@ -204,3 +337,15 @@ def delete_event(event_id: int) -> dict:
             }
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+
+@tool
+async def delete_event(event_id: int) -> dict:
+    """
+    Delete an event from the database.
+    Args:
+        event_id: The ID of the event to delete
+    Returns:
+        Dictionary with deletion status
+    """
+    return await asyncio.to_thread(_delete_event, event_id)
@@ -0,0 +1,16 @@
+import asyncio
+
+import httpx
+
+MAX_CONCURRENT_REQUESTS = 20
+
+http_client = httpx.AsyncClient(
+    timeout=10.0, limits=httpx.Limits(max_keepalive_connections=20)
+)
+
+_request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+
+async def fetch(url: str, params: dict) -> httpx.Response:
+    async with _request_semaphore:
+        return await http_client.get(url, params=params)
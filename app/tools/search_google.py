@@ -1,28 +1,21 @@
 import httpx
+from async_lru import alru_cache
 from config import Settings
 from langchain_core.tools import tool
 
+from .http_client import fetch
 
-@tool
-def google_search(query: str) -> dict:
-    """
-    Search the web using Google. Use this when the user asks about general knowledge questions.
-    Args:
-        query: The search query
-    Returns:
-        Search results as a dictionary
-    """
+
+@alru_cache(maxsize=256, ttl=600)
+async def _search(query: str) -> dict:
     url = "https://serpapi.com/search"
 
     params = {"q": query, "api_key": Settings.SERPAPI_APIKEY}
 
-    with httpx.Client(timeout=10.0) as client:
-        response = client.get(url, params=params)
-
-        if response.status_code != 200:
-            return {"error": f"API error: {response.status_code}"}
+    response = await fetch(url, params)
+    response.raise_for_status()
 
-        data = response.json()
+    data = response.json()
 
     organic = data.get("organic_results", [])[:5]
     return {
@@ -35,3 +28,18 @@ def google_search(query: str) -> dict:
             for r in organic
         ]
     }
+
+
+@tool
+async def google_search(query: str) -> dict:
+    """
+    Search the web using Google. Use this when the user asks about general knowledge questions.
+    Args:
+        query: The search query
+    Returns:
+        Search results as a dictionary
+    """
+    try:
+        return await _search(query)
+    except httpx.HTTPStatusError as e:
+        return {"error": f"API error: {e.response.status_code}"}
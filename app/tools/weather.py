@@ -1,10 +1,36 @@
 import httpx
+from async_lru import alru_cache
 from config import Settings
 from langchain_core.tools import tool
 
+from .http_client import fetch
+
+
+async def _fetch_weather(url: str, city: str) -> dict:
+    params = {"q": city, "units": "metric", "appid": Settings.OPENWEATHERMAP_APIKEY}
+
+    response = await fetch(url, params)
+    response.raise_for_status()
+
+    return response.json()
+
+
+@alru_cache(maxsize=256, ttl=60)
+async def _fetch_current_weather(city: str) -> dict:
+    return await _fetch_weather(
+        "https://api.openweathermap.org/data/2.5/weather", city
+    )
+
+
+@alru_cache(maxsize=256, ttl=300)
+async def _fetch_weather_forecast(city: str) -> dict:
+    return await _fetch_weather(
+        "https://api.openweathermap.org/data/2.5/forecast", city
+    )
+
 
 @tool()
-def get_current_weather(city: str) -> dict:
+async def get_current_weather(city: str) -> dict:
     """
     Get the current weather of a city
     Args:
@@ -12,23 +38,14 @@ def get_current_weather(city: str) -> dict:
     Returns:
         The weather of the city in dictionary
     """
-    url = "https://api.openweathermap.org/data/2.5/weather"
-
-    params = {"q": city, "units": "metric", "appid": Settings.OPENWEATHERMAP_APIKEY}
-
-    with httpx.Client(timeout=10.0) as client:
-        response = client.get(url, params=params)
-
-        if response.status_code != 200:
-            return {"error": f"API error: {response.status_code}"}
-
-        data = response.json()
-
-    return data
+    try:
+        return await _fetch_current_weather(city)
+    except httpx.HTTPStatusError as e:
+        return {"error": f"API error: {e.response.status_code}"}
 
 
 @tool
-def get_weather_forecast(city: str) -> dict:
+async def get_weather_forecast(city: str) -> dict:
     """
     Get the 5 day 3 hourly weather forecast of a city
     Args:
@@ -36,16 +53,7 @@ def get_weather_forecast(city: str) -> dict:
     Returns:
         The weather forecast of the city in dictionary
     """
-    url = "https://api.openweathermap.org/data/2.5/forecast"
-
-    params = {"q": city, "units": "metric", "appid": Settings.OPENWEATHERMAP_APIKEY}
-
-    with httpx.Client(timeout=10.0) as client:
-        response = client.get(url, params=params)
-
-        if response.status_code != 200:
-            return {"error": f"API error: {response.status_code}"}
-
-        data = response.json()
-
-    return data
+    try:
+        return await _fetch_weather_forecast(city)
+    except httpx.HTTPStatusError as e:
+        return {"error": f"API error: {e.response.status_code}"}
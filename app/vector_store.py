@@ -0,0 +1,90 @@
+import asyncio
+
+import chromadb
+from config import Settings
+from langchain_core.documents import Document
+from langchain_openai import OpenAIEmbeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+COLLECTION_NAME = "documents"
+
+splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+
+_collection = None
+_embeddings = None
+
+
+def get_collection():
+    global _collection
+    if _collection is None:
+        client = chromadb.PersistentClient(path=Settings.VECTOR_STORE_PATH)
+        _collection = client.get_or_create_collection(
+            COLLECTION_NAME, metadata={"hnsw:space": "cosine"}
+        )
+    return _collection
+
+
+def get_embeddings():
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = OpenAIEmbeddings(
+            openai_api_key=Settings.OPENROUTER_APIKEY,
+            openai_api_base="https://openrouter.ai/api/v1",
+            model=Settings.EMBEDDING_MODEL,
+            check_embedding_ctx_length=False,
+        )
+    return _embeddings
+
+
+def _replace_document_chunks(
+    conversation_id: str,
+    filename: str,
+    chunks: list[str],
+    embeddings: list[list[float]],
+):
+    collection = get_collection()
+    collection.delete(
+        where={
+            "$and": [
+                {"conversation_id": conversation_id},
+                {"filename": filename},
+            ]
+        }
+    )
+    collection.upsert(
+        ids=[f"{conversation_id}:{filename}:{i}" for i in range(len(chunks))],
+        embeddings=embeddings,
+        documents=chunks,
+        metadatas=[
+            {"conversation_id": conversation_id, "filename": filename}
+            for _ in chunks
+        ],
+    )
+
+
+async def index_documents(
+    conversation_id: str, filename: str, docs: list[Document]
+) -> int:
+    chunks = [c.page_content for c in splitter.split_documents(docs)]
+    if not chunks:
+        return 0
+
+    embeddings = await get_embeddings().aembed_documents(chunks)
+    await asyncio.to_thread(
+        _replace_document_chunks, conversation_id, filename, chunks, embeddings
+    )
+    return len(chunks)
+
+
+async def search_documents(conversation_id: str, query: str, k: int = 4) -> list[dict]:
+    embedding = await get_embeddings().aembed_query(query)
+    result = await asyncio.to_thread(
+        get_collection().query,
+        query_embeddings=[embedding],
+        n_results=k,
+        where={"conversation_id": conversation_id},
+    )
+    return [
+        {"filename": metadata["filename"], "content": document}
+        for document, metadata in zip(result["documents"][0], result["metadatas"][0])
+    ]
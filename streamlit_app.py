@@ -1,35 +1,130 @@
-import json
-import uuid
+import asyncio
+import atexit
+import hashlib
+import os
+import pickle
+import queue
+import tempfile
+import threading
+import time
+from pathlib import Path
 
 import httpx
+import orjson
 import streamlit as st
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 API_BASE = "http://localhost:8000"
+CACHE_PATH = Path("~/.mittai/cache.pkl").expanduser()
+CACHED_KEYS = ("conversations", "nonempty_conv_ids", "uploaded_files")
+STREAM_FLUSH_INTERVAL = 0.05
+STREAM_FLUSH_CHARS = 40
+SSE_HEADERS = {
+    "Accept": "text/event-stream",
+    "Accept-Encoding": "identity",
+    "Cache-Control": "no-cache",
+}
 
 st.set_page_config(page_title="Chat", layout="wide")
 
 # Initialize session state
-if "conversations" not in st.session_state:
-    st.session_state.conversations = {}
-if "current_conversation_id" not in st.session_state:
-    st.session_state.current_conversation_id = None
-if "init_done" not in st.session_state:
-    st.session_state.init_done = False
-if "upload_key" not in st.session_state:
-    st.session_state.upload_key = 0
+DEFAULTS = {
+    "conversations": {},
+    "current_conversation_id": None,
+    "init_done": False,
+    "upload_key": 0,
+    "uploaded_files": {},
+    "nonempty_conv_ids": [],
+    "chat_fragment_run": False,
+}
+for key, value in DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+
+
+@st.cache_resource
+def get_http_client():
+    client = httpx.Client(
+        base_url=API_BASE,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=50),
+        timeout=httpx.Timeout(5.0, read=120.0),
+    )
+    atexit.register(client.close)
+    return client
+
+
+def pump_chat_stream(client: httpx.Client, conv_id: str, prompt: str, events: queue.Queue):
+    try:
+        with client.stream(
+            "POST",
+            "/chat",
+            json={"message": prompt, "conversation_id": conv_id},
+            headers=SSE_HEADERS,
+        ) as response:
+            buf = bytearray()
+            for chunk in response.iter_bytes():
+                buf += chunk
+                while (i := buf.find(b"\n\n")) != -1:
+                    event = bytes(buf[:i])
+                    del buf[: i + 2]
+                    if not event.startswith(b"data: "):
+                        continue
+                    try:
+                        events.put(orjson.loads(memoryview(event)[6:]))
+                    except orjson.JSONDecodeError:
+                        continue
+    except httpx.RequestError as e:
+        events.put(e)
+    finally:
+        events.put(None)
+
+
+def new_conversation(title: str, messages: list):
+    return {"title": title, "display_label": title[:30], "messages": messages}
+
+
+def new_conversation_id():
+    import uuid
+
+    return uuid.uuid4().hex
+
+
+def load_cached_state():
+    try:
+        cached = pickle.loads(CACHE_PATH.read_bytes())
+    except Exception:
+        return
+    for key in CACHED_KEYS:
+        st.session_state[key] = cached.get(key, st.session_state[key])
+
+
+def _write_cache(data: bytes):
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=CACHE_PATH.parent, delete=False) as tmp:
+        tmp.write(data)
+    os.replace(tmp.name, CACHE_PATH)
+
+
+def save_cached_state():
+    data = pickle.dumps({key: st.session_state[key] for key in CACHED_KEYS}, protocol=5)
+    threading.Thread(target=_write_cache, args=(data,), daemon=True).start()
 
 
 def get_or_create_conversation():
     if st.session_state.current_conversation_id is None:
-        conv_id = str(uuid.uuid4())
-        st.session_state.conversations[conv_id] = {"title": "New Chat", "messages": []}
+        conv_id = new_conversation_id()
+        st.session_state.conversations[conv_id] = new_conversation("New Chat", [])
         st.session_state.current_conversation_id = conv_id
     return st.session_state.current_conversation_id
 
 
 def start_new_conversation():
-    conv_id = str(uuid.uuid4())
-    st.session_state.conversations[conv_id] = {"title": "New Chat", "messages": []}
+    conv_id = new_conversation_id()
+    st.session_state.conversations[conv_id] = new_conversation("New Chat", [])
     st.session_state.current_conversation_id = conv_id
 
 
@@ -40,36 +135,100 @@ def current_chat_has_messages():
     return conv and len(conv.get("messages", [])) > 0
 
 
+@st.cache_data(ttl=60)
+def _fetch_conversation_list():
+    resp = get_http_client().get("/conversations-list", timeout=5.0)
+    resp.raise_for_status()
+    return orjson.loads(resp.content).get("message_counts", {})
+
+
+async def _fetch_conversations(conv_ids: list[str]):
+    async with httpx.AsyncClient(
+        base_url=API_BASE, limits=httpx.Limits(max_connections=20), timeout=5.0
+    ) as client:
+        return await asyncio.gather(
+            *(client.get(f"/chat/{conv_id}") for conv_id in conv_ids),
+            return_exceptions=True,
+        )
+
+
 def fetch_conversation_list():
     try:
-        resp = httpx.get(f"{API_BASE}/conversations-list", timeout=5.0)
-        if resp.status_code == 200:
-            return resp.json().get("conversations", [])
-    except httpx.RequestError:
-        pass
-    return []
+        return _fetch_conversation_list()
+    except (httpx.HTTPError, orjson.JSONDecodeError):
+        return None
+
+
+def file_digest(uploaded) -> str:
+    with uploaded.getbuffer() as data:
+        if xxhash is not None:
+            return xxhash.xxh3_64(data).hexdigest()
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def upload_message(filename: str, digest: str | None = None):
+    return {
+        "role": "system",
+        "kind": "upload",
+        "filename": filename,
+        "digest": digest,
+        "content": f"User uploaded a document: {filename}",
+    }
+
+
+def store_conversation(conv_id: str, messages: list):
+    title = "Chat"
+    for i, msg in enumerate(messages):
+        content = msg.get("content", "")
+        if msg.get("role") == "system" and content.startswith("User uploaded a document:"):
+            filename = content.split("\n")[0].replace("User uploaded a document: ", "")
+            messages[i] = upload_message(filename)
+        elif title == "Chat" and msg.get("role") == "user":
+            title = content[:40] or "Chat"
+    st.session_state.conversations[conv_id] = new_conversation(title, messages)
+    if messages and conv_id not in st.session_state.nonempty_conv_ids:
+        st.session_state.nonempty_conv_ids.append(conv_id)
+    # Digests aren't stored server-side, so keep any known from the cached copy
+    st.session_state.uploaded_files.setdefault(conv_id, set()).update(
+        msg["digest"] for msg in messages if msg.get("kind") == "upload" and msg.get("digest")
+    )
 
 
-def load_conversation(conv_id: str):
-    if conv_id in st.session_state.conversations:
+def prune_conversations(conv_ids: list[str]):
+    known = set(conv_ids)
+    known.add(st.session_state.current_conversation_id)
+    for key in ("conversations", "uploaded_files"):
+        state = st.session_state[key]
+        for conv_id in [cid for cid in state if cid not in known]:
+            del state[conv_id]
+    st.session_state.nonempty_conv_ids = [
+        cid for cid in st.session_state.nonempty_conv_ids if cid in known
+    ]
+
+
+def load_conversations(message_counts: dict[str, int]):
+    # Refetch only conversations missing from the cache or out of step with the backend
+    conversations = st.session_state.conversations
+    conv_ids = [
+        cid
+        for cid, count in message_counts.items()
+        if cid not in conversations or len(conversations[cid]["messages"]) != count
+    ]
+    if not conv_ids:
         return
-    try:
-        resp = httpx.get(f"{API_BASE}/chat/{conv_id}", timeout=5.0)
-        if resp.status_code == 200:
-            data = resp.json()
-            messages = data.get("messages", [])
-            title = "Chat"
-            for msg in messages:
-                if msg.get("role") == "user":
-                    title = msg.get("content", "Chat")[:40]
-                    break
-            st.session_state.conversations[conv_id] = {"title": title, "messages": messages}
-    except httpx.RequestError:
-        pass
+    responses = asyncio.run(_fetch_conversations(conv_ids))
+    for conv_id, resp in zip(conv_ids, responses):
+        if isinstance(resp, httpx.Response) and resp.status_code == 200:
+            try:
+                messages = orjson.loads(resp.content).get("messages", [])
+            except orjson.JSONDecodeError:
+                continue
+            store_conversation(conv_id, messages)
 
 
 # --- Sidebar ---
-with st.sidebar:
+@st.fragment
+def render_sidebar():
     st.title("💬 Conversations")
 
     if st.button("➕ New Chat", use_container_width=True, disabled=not current_chat_has_messages()):
@@ -78,116 +237,160 @@ with st.sidebar:
 
     st.divider()
 
-    # Load from API only once on startup
+    # Load from the local cache, drop what the backend no longer has,
+    # then fetch only conversations the cache is missing or behind on
     if not st.session_state.init_done:
-        for conv_id in fetch_conversation_list():
-            load_conversation(conv_id)
+        load_cached_state()
+        message_counts = fetch_conversation_list()
+        if message_counts is not None:
+            prune_conversations(list(message_counts))
+            load_conversations(message_counts)
+        save_cached_state()
         st.session_state.init_done = True
 
     # Display from local state (fast) - newest first
-    conv_ids = list(st.session_state.conversations.keys())
-    for conv_id in reversed(conv_ids):
-        conv_data = st.session_state.conversations[conv_id]
-        if not conv_data.get("messages"):
-            continue
-            
-        is_current = conv_id == st.session_state.current_conversation_id
-        label = conv_data.get("title", "Chat")[:30]
-
-        if st.button(
-            f"{'\u25b6 ' if is_current else ''}{label}",
-            key=conv_id,
-            use_container_width=True,
-            type="primary" if is_current else "secondary",
-        ):
-            st.session_state.current_conversation_id = conv_id
-            st.rerun()
+    conv_ids = st.session_state.nonempty_conv_ids[::-1]
+    current_id = st.session_state.current_conversation_id
+    choice = st.radio(
+        "Conversations",
+        options=conv_ids,
+        index=conv_ids.index(current_id) if current_id in conv_ids else None,
+        format_func=lambda cid: st.session_state.conversations[cid].get("display_label") or "Chat",
+        label_visibility="collapsed",
+    )
+    if choice is not None and choice != current_id:
+        st.session_state.current_conversation_id = choice
+        st.rerun()
 
-# --- Main Chat Area ---
-st.title("Chat")
 
-conv_id = get_or_create_conversation()
-messages = st.session_state.conversations[conv_id]["messages"]
+def rerun_chat(refresh_sidebar: bool):
+    # Fragment scope is only valid when render_chat is running as a fragment rerun
+    fragment_only = st.session_state.chat_fragment_run and not refresh_sidebar
+    st.rerun(scope="fragment" if fragment_only else "app")
 
-# File upload at top
-uploaded = st.file_uploader("Upload a document (PDF/TXT)", type=["pdf", "txt"], key=f"upload_{st.session_state.upload_key}")
-if uploaded:
-    # Check if already uploaded in this conversation (by checking messages)
-    already_uploaded = any(
-        msg.get("content", "").startswith(f"User uploaded a document: {uploaded.name}")
-        for msg in messages if msg.get("role") == "system"
-    )
-    
-    if not already_uploaded:
-        with st.spinner(f"Uploading {uploaded.name}..."):
-            files = {"file": (uploaded.name, uploaded.getvalue())}
-            data = {"conversation_id": conv_id}
-            try:
-                resp = httpx.post(f"{API_BASE}/ingest-file", files=files, data=data, timeout=60.0)
-                if resp.status_code == 200:
-                    messages.append({"role": "system", "content": f"User uploaded a document: {uploaded.name}"})
-                    st.session_state.upload_key += 1  # Clear uploader
-                    st.rerun()
-            except httpx.RequestError:
-                st.error("Failed to upload file")
-
-# Display chat history
-for msg in messages:
-    role = msg["role"]
-    content = msg["content"]
-    
-    if role == "system" and content.startswith("User uploaded a document:"):
-        filename = content.split("\n")[0].replace("User uploaded a document: ", "")
+
+# --- Main Chat Area ---
+@st.fragment
+def render_chat():
+    conv_id = get_or_create_conversation()
+    messages = st.session_state.conversations[conv_id]["messages"]
+
+    # File upload at top
+    uploaded = st.file_uploader("Upload a document (PDF/TXT)", type=["pdf", "txt"], key=f"upload_{st.session_state.upload_key}")
+    if uploaded:
+        digest = file_digest(uploaded)
+        already_uploaded = digest in st.session_state.uploaded_files.get(conv_id, ())
+
+        if not already_uploaded:
+            with st.spinner(f"Uploading {uploaded.name}..."):
+                uploaded.seek(0)
+                files = {"file": (uploaded.name, uploaded, uploaded.type or "application/octet-stream")}
+                data = {"conversation_id": conv_id}
+                try:
+                    resp = get_http_client().post("/ingest-file", files=files, data=data, timeout=60.0)
+                    if resp.status_code == 200:
+                        # First message makes the conversation appear in the sidebar
+                        refresh_sidebar = not messages
+                        if refresh_sidebar:
+                            st.session_state.nonempty_conv_ids.append(conv_id)
+                        messages.append(upload_message(uploaded.name, digest))
+                        st.session_state.uploaded_files.setdefault(conv_id, set()).add(digest)
+                        _fetch_conversation_list.clear()
+                        save_cached_state()
+                        st.session_state.upload_key += 1  # Clear uploader
+                        rerun_chat(refresh_sidebar)
+                except httpx.RequestError:
+                    st.error("Failed to upload file")
+
+    # Display chat history
+    for msg in messages:
+        role = msg["role"]
+
+        if msg.get("kind") == "upload":
+            with st.chat_message("user"):
+                st.markdown(f"📎 **Uploaded:** {msg['filename']}")
+        elif role in ["user", "assistant"]:
+            with st.chat_message(role):
+                st.markdown(msg["content"])
+
+    # Chat input
+    prompt = st.chat_input("Type your message...")
+
+    if prompt:
+        refresh_sidebar = not messages
+        if refresh_sidebar:
+            st.session_state.nonempty_conv_ids.append(conv_id)
+
+        # Display and store user message first
         with st.chat_message("user"):
-            st.markdown(f"📎 **Uploaded:** {filename}")
-    elif role in ["user", "assistant"]:
-        with st.chat_message(role):
-            st.markdown(content)
-
-# Chat input
-prompt = st.chat_input("Type your message...")
-
-if prompt:
-    # Display and store user message first
-    with st.chat_message("user"):
-        st.markdown(prompt)
-    messages.append({"role": "user", "content": prompt})
-
-    if st.session_state.conversations[conv_id]["title"] == "New Chat":
-        st.session_state.conversations[conv_id]["title"] = prompt[:40]
-
-    with st.chat_message("assistant"):
-        response_placeholder = st.empty()
-        full_response = ""
-        tool_status = st.status("Thinking...")
-
-        try:
-            with httpx.stream(
-                "POST",
-                f"{API_BASE}/chat",
-                json={"message": prompt, "conversation_id": conv_id},
-                timeout=120.0,
-            ) as response:
-                for line in response.iter_lines():
-                    if line.startswith("data: "):
-                        try:
-                            event_data = json.loads(line[6:])
-                            if event_data["type"] == "text":
-                                full_response += event_data["content"]
-                                response_placeholder.markdown(full_response + "▌")
-                            elif event_data["type"] == "tool_call":
-                                for name, _ in event_data["content"]:
-                                    tool_status.update(label=f"Using {name}...")
-                        except json.JSONDecodeError:
-                            pass
-
-            response_placeholder.markdown(full_response)
-            tool_status.update(label="Done", state="complete")
-
-        except httpx.RequestError as e:
-            st.error(f"Connection error: {e}")
-            full_response = "Sorry, I couldn't connect to the server."
-
-        messages.append({"role": "assistant", "content": full_response})
-    
-    st.rerun()
+            st.markdown(prompt)
+        messages.append({"role": "user", "content": prompt})
+
+        conv = st.session_state.conversations[conv_id]
+        if conv["title"] == "New Chat":
+            conv["title"] = prompt[:40]
+            conv["display_label"] = conv["title"][:30]
+            refresh_sidebar = True
+
+        with st.chat_message("assistant"):
+            response_placeholder = st.empty()
+            parts: list[str] = []
+            pending_chars = 0
+            last_flush = time.monotonic()
+            tool_status = st.status("Thinking...")
+
+            events = queue.Queue()
+            threading.Thread(
+                target=pump_chat_stream,
+                args=(get_http_client(), conv_id, prompt, events),
+                daemon=True,
+            ).start()
+
+            error = None
+            while True:
+                try:
+                    event_data = events.get(timeout=STREAM_FLUSH_INTERVAL)
+                except queue.Empty:
+                    event_data = {"type": "idle"}
+                if event_data is None:
+                    break
+
+                if isinstance(event_data, httpx.RequestError):
+                    error = event_data
+                elif event_data["type"] == "text":
+                    parts.append(event_data["content"])
+                    pending_chars += len(event_data["content"])
+                elif event_data["type"] == "tool_call":
+                    for name, _ in event_data["content"]:
+                        tool_status.update(label=f"Using {name}...")
+
+                now = time.monotonic()
+                if pending_chars and (now - last_flush > STREAM_FLUSH_INTERVAL or pending_chars > STREAM_FLUSH_CHARS):
+                    response_placeholder.markdown("".join(parts) + "▌")
+                    last_flush = now
+                    pending_chars = 0
+
+            if error is None:
+                full_response = "".join(parts)
+                response_placeholder.markdown(full_response)
+                tool_status.update(label="Done", state="complete")
+            else:
+                st.error(f"Connection error: {error}")
+                full_response = "Sorry, I couldn't connect to the server."
+
+            messages.append({"role": "assistant", "content": full_response})
+            if error is None:
+                # The list carries message counts, so every stored turn changes it
+                _fetch_conversation_list.clear()
+            save_cached_state()
+
+        rerun_chat(refresh_sidebar)
+
+
+with st.sidebar:
+    render_sidebar()
+
+st.title("Chat")
+st.session_state.chat_fragment_run = False
+render_chat()
+st.session_state.chat_fragment_run = True